@@ -9,7 +9,7 @@ router = APIRouter()
 
 
 @router.get("/summary", response_model=MetricsSummaryResponse)
-async def get_summary() -> MetricsSummaryResponse:
+def get_summary() -> MetricsSummaryResponse:
     """Get aggregated metrics summary across all prompts."""
     summary = metrics_service.get_summary()
     return MetricsSummaryResponse(**summary)
@@ -1,6 +1,6 @@
 """Router for prompt CRUD operations."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
 from api.schemas import (
     PromptCreate,
@@ -9,22 +9,29 @@ from api.schemas import (
     PromptListResponse,
 )
 from api.services import prompt_service
+from src import jsonio
 
 router = APIRouter()
 
 
 @router.get("", response_model=PromptListResponse)
-async def list_prompts() -> PromptListResponse:
+def list_prompts(request: Request) -> Response:
     """List all prompts."""
+    etag = prompt_service.get_prompts_etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Prompt files are validated when written, so serialize them as stored
     prompts = prompt_service.list_prompts()
-    return PromptListResponse(
-        prompts=[PromptResponse(**p) for p in prompts],
-        total=len(prompts),
+    return Response(
+        content=jsonio.dumps({"prompts": prompts, "total": len(prompts)}),
+        media_type="application/json",
+        headers={"ETag": etag},
     )
 
 
 @router.post("", response_model=PromptResponse, status_code=201)
-async def create_prompt(data: PromptCreate) -> PromptResponse:
+def create_prompt(data: PromptCreate) -> PromptResponse:
     """Create a new prompt."""
     try:
         prompt = prompt_service.create_prompt(
@@ -38,7 +45,7 @@ async def create_prompt(data: PromptCreate) -> PromptResponse:
 
 
 @router.get("/{prompt_id}", response_model=PromptResponse)
-async def get_prompt(prompt_id: str) -> PromptResponse:
+def get_prompt(prompt_id: str) -> PromptResponse:
     """Get a single prompt by ID."""
     prompt = prompt_service.get_prompt(prompt_id)
     if prompt is None:
@@ -47,7 +54,7 @@ async def get_prompt(prompt_id: str) -> PromptResponse:
 
 
 @router.put("/{prompt_id}", response_model=PromptResponse)
-async def update_prompt(prompt_id: str, data: PromptUpdate) -> PromptResponse:
+def update_prompt(prompt_id: str, data: PromptUpdate) -> PromptResponse:
     """Update an existing prompt."""
     prompt = prompt_service.update_prompt(
         prompt_id=prompt_id,
@@ -60,7 +67,7 @@ async def update_prompt(prompt_id: str, data: PromptUpdate) -> PromptResponse:
 
 
 @router.delete("/{prompt_id}", status_code=204)
-async def delete_prompt(prompt_id: str) -> None:
+def delete_prompt(prompt_id: str) -> None:
     """Delete a prompt."""
     deleted = prompt_service.delete_prompt(prompt_id)
     if not deleted:
@@ -25,17 +25,19 @@ def _run_to_response(run: dict) -> RunResponse:
 
 
 @router.get("", response_model=RunListResponse)
-async def list_runs(prompt_id: str | None = Query(None)) -> RunListResponse:
-    """List all runs, optionally filtered by prompt_id."""
-    runs = run_service.list_runs(prompt_id)
-    return RunListResponse(
-        runs=[_run_to_response(r) for r in runs],
-        total=len(runs),
-    )
+def list_runs(
+    prompt_id: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, description="Max runs to return (default: all)"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+) -> dict:
+    """List runs newest first, optionally filtered by prompt_id."""
+    runs = run_service.list_runs(prompt_id, limit=limit, offset=offset)
+    # Plain dicts: FastAPI validates them once against the response model
+    return {"runs": runs, "total": run_service.count_runs(prompt_id)}
 
 
 @router.post("", response_model=RunResponse, status_code=202)
-async def create_run(data: RunCreate, background_tasks: BackgroundTasks) -> RunResponse:
+def create_run(data: RunCreate, background_tasks: BackgroundTasks) -> RunResponse:
     """Create and start a new test run."""
     # Verify prompt exists
     prompt = get_prompt(data.prompt_id)
@@ -52,7 +54,7 @@ async def create_run(data: RunCreate, background_tasks: BackgroundTasks) -> RunR
 
 
 @router.get("/{run_id}", response_model=RunResponse)
-async def get_run(run_id: str) -> RunResponse:
+def get_run(run_id: str) -> RunResponse:
     """Get a single run by ID."""
     run = run_service.get_run(run_id)
     if run is None:
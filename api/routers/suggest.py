@@ -1,13 +1,17 @@
 """Router for LLM-powered prompt improvement suggestions."""
 
-import json
+import asyncio
+import heapq
 import os
+import re
+import threading
 
 import maitai
 
 from fastapi import APIRouter, HTTPException
 
 from api.schemas import SuggestRequest, SuggestResponse
+from src import jsonio
 from src.config import MAITAI_API_KEY, ANTHROPIC_API_KEY, MODEL_NAME, APPLICATION_NAME
 
 # Workaround: Set placeholder to prevent Groq client init error
@@ -15,6 +19,13 @@ os.environ["GROQ_API_KEY"] = "placeholder-not-used"
 
 router = APIRouter()
 
+# Bullet ("- ", "* ", "• ") or numbered ("1. ", "2) ") list item, capturing its text
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+)$")
+
+# Shared Maitai client, created on the first request and reused afterwards
+_client: maitai.AsyncMaitai | None = None
+_client_lock = threading.Lock()
+
 SUGGEST_SYSTEM_PROMPT = """You are an expert prompt engineer analyzing classification prompt performance.
 
 Given the current prompt template, test metrics, and failure cases, provide:
@@ -36,16 +47,41 @@ Output ONLY the improved prompt template. Do not include any explanation or comm
 The prompt must include {ticket} as a placeholder for the ticket text."""
 
 
-def _build_analysis_prompt(data: SuggestRequest) -> str:
-    """Build the analysis prompt from request data."""
-    failed_examples = "\n".join(
+def _create_client() -> maitai.AsyncMaitai:
+    """Create the shared Maitai client if no other caller has yet."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = maitai.AsyncMaitai(
+                maitai_api_key=MAITAI_API_KEY,
+                anthropic_api_key=ANTHROPIC_API_KEY,
+            )
+    return _client
+
+
+async def _get_client() -> maitai.AsyncMaitai:
+    """Get the shared Maitai client, creating it off the event loop on first use."""
+    client = _client
+    if client is None:
+        # The Maitai constructor makes a blocking HTTP call to initialize the SDK
+        client = await asyncio.to_thread(_create_client)
+    return client
+
+
+def _format_failed_examples(failed_cases: list[dict]) -> str:
+    """Format a sample of failed cases for inclusion in a prompt."""
+    sample = failed_cases[:10]
+    return "\n".join(
         f"  - Ticket: \"{fc['ticket'][:100]}...\"\n"
         f"    Expected: {fc['expected']}, Got: {fc['predicted']}"
-        for fc in data.failed_cases[:10]
+        for fc in sample
     )
 
-    confusion_str = json.dumps(data.confusion_matrix, indent=2)
 
+def _build_analysis_prompt(
+    data: SuggestRequest, confusion_str: str, failed_examples: str
+) -> str:
+    """Build the analysis prompt from request data."""
     return f"""## Current Prompt Template
 ```
 {data.prompt_template}
@@ -56,7 +92,7 @@ def _build_analysis_prompt(data: SuggestRequest) -> str:
 - Correct: {data.metrics.get('correct', 0)} / {data.metrics.get('total', 0)}
 
 ## Per-Category Performance
-{json.dumps(data.category_stats, indent=2)}
+{jsonio.dumps(data.category_stats, indent=True).decode()}
 
 ## Confusion Matrix (Actual → Predicted)
 {confusion_str}
@@ -67,10 +103,16 @@ def _build_analysis_prompt(data: SuggestRequest) -> str:
 Based on this analysis, what specific changes would improve this classification prompt?"""
 
 
-def _build_enhance_prompt(data: SuggestRequest, suggestions: list[str]) -> str:
-    """Build the prompt for generating an enhanced version."""
-    suggestions_text = "\n".join(f"- {s}" for s in suggestions)
+def _build_enhance_prompt(
+    data: SuggestRequest,
+    priority_categories: list[str],
+    failed_examples: str,
+) -> str:
+    """Build the prompt for generating an enhanced version.
 
+    Built from the test results alone (not the analysis call's suggestions)
+    so both LLM calls can run concurrently.
+    """
     return f"""## Original Prompt
 ```
 {data.prompt_template}
@@ -78,10 +120,10 @@ def _build_enhance_prompt(data: SuggestRequest, suggestions: list[str]) -> str:
 
 ## Issues Found
 - Overall accuracy: {data.metrics.get('overall_accuracy', 0):.1%}
-- Categories with most errors: {', '.join(_extract_priority_categories(data.category_stats))}
+- Categories with most errors: {', '.join(priority_categories)}
 
-## Suggestions to Address
-{suggestions_text}
+## Sample Failed Cases ({len(data.failed_cases)} total failures)
+{failed_examples}
 
 Create an improved version of this prompt that addresses these issues. Output only the prompt template."""
 
@@ -90,52 +132,52 @@ Create an improved version of this prompt that addresses these issues. Output on
 async def get_suggestions(data: SuggestRequest) -> SuggestResponse:
     """Get LLM-powered suggestions for prompt improvement."""
     try:
-        client = maitai.Maitai(
-            maitai_api_key=MAITAI_API_KEY,
-            anthropic_api_key=ANTHROPIC_API_KEY,
-        )
+        client = await _get_client()
 
-        # First call: Get analysis and suggestions
-        analysis_prompt = _build_analysis_prompt(data)
-
-        analysis_response = client.chat.completions.create(
-            application=APPLICATION_NAME,
-            intent="suggest_improvements",
-            model=MODEL_NAME,
-            session_id=f"suggest-{data.prompt_id}",
-            max_tokens=1500,
-            messages=[
-                {"role": "system", "content": SUGGEST_SYSTEM_PROMPT},
-                {"role": "user", "content": analysis_prompt},
-            ],
-            metadata={
-                "prompt_id": data.prompt_id,
-                "accuracy": str(data.metrics.get("overall_accuracy", 0)),
-                "total_failures": str(len(data.failed_cases)),
-            },
+        # Build prompt fragments once; the failed-case sample is shared by both calls
+        confusion_str = jsonio.dumps(data.confusion_matrix, indent=True).decode()
+        failed_examples = _format_failed_examples(data.failed_cases)
+        priority_categories = _extract_priority_categories(data.category_stats)
+
+        analysis_prompt = _build_analysis_prompt(data, confusion_str, failed_examples)
+        enhance_prompt = _build_enhance_prompt(data, priority_categories, failed_examples)
+
+        # Analysis/suggestions and enhanced prompt are independent; run them together
+        analysis_response, enhance_response = await asyncio.gather(
+            client.chat.completions.create(
+                application=APPLICATION_NAME,
+                intent="suggest_improvements",
+                model=MODEL_NAME,
+                session_id=f"suggest-{data.prompt_id}",
+                max_tokens=1500,
+                messages=[
+                    {"role": "system", "content": SUGGEST_SYSTEM_PROMPT},
+                    {"role": "user", "content": analysis_prompt},
+                ],
+                metadata={
+                    "prompt_id": data.prompt_id,
+                    "accuracy": str(data.metrics.get("overall_accuracy", 0)),
+                    "total_failures": str(len(data.failed_cases)),
+                },
+            ),
+            client.chat.completions.create(
+                application=APPLICATION_NAME,
+                intent="enhance_prompt",
+                model=MODEL_NAME,
+                session_id=f"enhance-{data.prompt_id}",
+                max_tokens=2000,
+                messages=[
+                    {"role": "system", "content": ENHANCE_SYSTEM_PROMPT},
+                    {"role": "user", "content": enhance_prompt},
+                ],
+                metadata={
+                    "prompt_id": data.prompt_id,
+                },
+            ),
         )
 
         analysis_text = analysis_response.choices[0].message.content
         suggestions = _parse_suggestions(analysis_text)
-        priority_categories = _extract_priority_categories(data.category_stats)
-
-        # Second call: Generate enhanced prompt
-        enhance_prompt = _build_enhance_prompt(data, suggestions)
-
-        enhance_response = client.chat.completions.create(
-            application=APPLICATION_NAME,
-            intent="enhance_prompt",
-            model=MODEL_NAME,
-            session_id=f"enhance-{data.prompt_id}",
-            max_tokens=2000,
-            messages=[
-                {"role": "system", "content": ENHANCE_SYSTEM_PROMPT},
-                {"role": "user", "content": enhance_prompt},
-            ],
-            metadata={
-                "prompt_id": data.prompt_id,
-            },
-        )
 
         enhanced_prompt = enhance_response.choices[0].message.content.strip()
 
@@ -158,29 +200,24 @@ async def get_suggestions(data: SuggestRequest) -> SuggestResponse:
 def _parse_suggestions(response_text: str) -> list[str]:
     """Extract bullet-point suggestions from response."""
     suggestions = []
-    lines = response_text.split("\n")
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith(("- ", "* ", "• ")) or (
-            len(line) > 2 and line[0].isdigit() and line[1] in ".)"
-        ):
-            clean = line.lstrip("-*•0123456789.) ").strip()
-            if clean and len(clean) > 10:
+
+    for line in response_text.splitlines():
+        match = _BULLET_RE.match(line)
+        if match:
+            clean = match.group(1).strip()
+            if len(clean) > 10:
                 suggestions.append(clean)
+                if len(suggestions) == 5:
+                    break
 
-    return suggestions[:5] if suggestions else ["Review the analysis above for improvement ideas"]
+    return suggestions or ["Review the analysis above for improvement ideas"]
 
 
 def _extract_priority_categories(category_stats: dict) -> list[str]:
     """Find categories with lowest accuracy."""
-    accuracies = []
-    for category, stats in category_stats.items():
-        total = stats.get("total", 0)
-        correct = stats.get("correct", 0)
-        if total > 0:
-            acc = correct / total
-            accuracies.append((category, acc))
-
-    accuracies.sort(key=lambda x: x[1])
-    return [cat for cat, _ in accuracies[:3]]
+    accuracies = (
+        (category, stats.get("correct", 0) / total)
+        for category, stats in category_stats.items()
+        if (total := stats.get("total", 0)) > 0
+    )
+    return [cat for cat, _ in heapq.nsmallest(3, accuracies, key=lambda x: x[1])]
@@ -1,40 +1,46 @@
 """Router for test set endpoints."""
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request, Response
 
-from api.schemas import TestSetResponse, TestSetDetailResponse, TestCase
+from api.schemas import TestSetResponse, TestSetDetailResponse
 from api.services import metrics_service
 
 router = APIRouter()
 
 
 @router.get("", response_model=TestSetResponse)
-async def get_test_set_info() -> TestSetResponse:
+def get_test_set_info(request: Request) -> Response:
     """Get test set metadata (total, categories, distribution)."""
-    info = metrics_service.get_test_set_info()
-    return TestSetResponse(**info)
+    etag = metrics_service.get_test_set_info_etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Serialized once per test set load; returning a Response skips re-validation
+    return Response(
+        content=metrics_service.get_test_set_info_json(),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
 
 
 @router.get("/cases", response_model=TestSetDetailResponse)
-async def get_test_set_cases(
+def get_test_set_cases(
     category: str | None = Query(None, description="Filter by category"),
     limit: int = Query(50, ge=1, le=200, description="Max cases to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
-) -> TestSetDetailResponse:
+) -> dict:
     """Get test cases with optional filtering."""
-    cases = metrics_service.get_test_set_cases()
+    # Filter by category if provided (pre-bucketed, so this is a lookup)
+    cases = metrics_service.get_test_set_cases(category)
     info = metrics_service.get_test_set_info()
 
-    # Filter by category if provided
-    if category:
-        cases = [c for c in cases if c["expected"] == category.upper()]
-
-    # Apply pagination
+    # Apply pagination; slicing copies only the requested window
     total = len(cases)
     cases = cases[offset : offset + limit]
 
-    return TestSetDetailResponse(
-        total=total,
-        categories=info["categories"],
-        cases=[TestCase(**c) for c in cases],
-    )
+    # Plain dicts: FastAPI validates them once against the response model
+    return {
+        "total": total,
+        "categories": info["categories"],
+        "cases": cases,
+    }
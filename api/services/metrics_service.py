@@ -1,58 +1,137 @@
 """Service for aggregating metrics and test set information."""
 
-import json
-from collections import defaultdict
-from pathlib import Path
-from typing import Any
+import hashlib
+from collections import Counter, defaultdict
+from typing import Any, Mapping, Sequence
 
+from api.services import test_set_service
 from api.services.prompt_service import list_prompts
-from api.services.run_service import list_runs
+from api.services.run_service import get_index_state, list_runs
+from src import jsonio
 
-# Base paths
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-TEST_SET_PATH = DATA_DIR / "test_set.json"
+# Lookups derived from the test set, keyed on the identity of the loaded cases
+_test_set_cache: dict[str, Any] | None = None
 
+# Per-prompt run aggregates, reset whenever the run index changes
+_run_stats_cache: tuple[int, dict[str, tuple[float | None, float | None, int]]] | None = None
 
-def _load_test_set() -> list[dict[str, Any]]:
-    """Load the test set from JSON."""
-    with open(TEST_SET_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
 
+def invalidate() -> None:
+    """Drop the cached test set so the next access re-reads it from disk."""
+    global _test_set_cache
+    _test_set_cache = None
+    test_set_service.invalidate()
 
-def get_test_set_info() -> dict[str, Any]:
-    """Get test set metadata including category distribution."""
-    test_cases = _load_test_set()
-
-    # Count categories
-    category_counts: dict[str, int] = defaultdict(int)
-    for case in test_cases:
-        category_counts[case["expected"]] += 1
 
-    categories = sorted(category_counts.keys())
+def _build_test_set_info(expected: tuple[str, ...]) -> dict[str, Any]:
+    """Build test set metadata including category distribution."""
+    category_counts = Counter(expected)
 
     return {
-        "total": len(test_cases),
-        "categories": categories,
+        "total": len(expected),
+        "categories": sorted(category_counts.keys()),
         "category_counts": dict(category_counts),
     }
 
 
-def get_test_set_cases() -> list[dict[str, Any]]:
-    """Get all test cases."""
-    return _load_test_set()
+def _get_cached_test_set() -> dict[str, Any]:
+    """Return the parsed test set and its lookups, re-reading only on change."""
+    global _test_set_cache
+    test_cases = test_set_service.load_test_set()
+    cache = _test_set_cache
+    if cache is None or cache["cases"] is not test_cases:
+        expected = tuple(case["expected"] for case in test_cases)
+
+        # Bucket keys are uppercased once here so lookups never scan the cases
+        by_category: dict[str, list[Mapping[str, Any]]] = defaultdict(list)
+        for category, case in zip(expected, test_cases):
+            by_category[category.upper()].append(case)
+
+        info = _build_test_set_info(expected)
+        info_json = jsonio.dumps(info)
+        cache = {
+            "cases": test_cases,
+            "info": info,
+            "info_json": info_json,
+            "info_etag": f'"{hashlib.blake2b(info_json, digest_size=8).hexdigest()}"',
+            "by_category": dict(by_category),
+        }
+        _test_set_cache = cache
+    return cache
+
+
+def get_test_set_info() -> dict[str, Any]:
+    """Get test set metadata including category distribution."""
+    return _get_cached_test_set()["info"]
+
+
+def get_test_set_info_json() -> bytes:
+    """Get test set metadata pre-serialized as JSON."""
+    return _get_cached_test_set()["info_json"]
+
+
+def get_test_set_info_etag() -> str:
+    """Get the ETag of the pre-serialized test set metadata."""
+    return _get_cached_test_set()["info_etag"]
+
+
+def get_test_set_cases(category: str | None = None) -> Sequence[Mapping[str, Any]]:
+    """Get all test cases, or only those expecting the given category.
+
+    The category is matched case-insensitively.
+    """
+    if not category:
+        return test_set_service.load_test_set()
+    return _get_cached_test_set()["by_category"].get(category.upper(), [])
+
+
+def _aggregate_runs(runs: list[dict[str, Any]]) -> tuple[float | None, float | None, int]:
+    """Compute (latest_accuracy, best_accuracy, run_count) over completed runs."""
+    latest_created_at: str | None = None
+    latest_accuracy: float | None = None
+    best_accuracy: float | None = None
+    run_count = 0
+
+    # Latest run's accuracy and best accuracy across all runs, in one pass
+    for run in runs:
+        if run.get("status") != "completed" or not run.get("metrics"):
+            continue
+        run_count += 1
+        accuracy = run["metrics"]["overall_accuracy"]
+        created_at = run.get("created_at", "")
+        if latest_created_at is None or created_at > latest_created_at:
+            latest_created_at = created_at
+            latest_accuracy = accuracy
+        if best_accuracy is None or accuracy > best_accuracy:
+            best_accuracy = accuracy
+
+    return latest_accuracy, best_accuracy, run_count
+
+
+def _get_run_stats(
+    prompt_id: str, version: int
+) -> tuple[float | None, float | None, int]:
+    """Get a prompt's run aggregates, memoized until the run index changes."""
+    global _run_stats_cache
+    cache = _run_stats_cache
+    if cache is None or cache[0] != version:
+        cache = (version, {})
+        _run_stats_cache = cache
+
+    stats = cache[1].get(prompt_id)
+    if stats is None:
+        stats = _aggregate_runs(list_runs(prompt_id, rescan=False))
+        cache[1][prompt_id] = stats
+    return stats
 
 
 def get_summary() -> dict[str, Any]:
     """Aggregate metrics across all prompts and runs."""
-    prompts = list_prompts()
-    all_runs = list_runs()
+    prompts = list_prompts(summary=True)
     test_set_info = get_test_set_info()
 
-    # Group runs by prompt_id
-    runs_by_prompt: dict[str, list[dict]] = defaultdict(list)
-    for run in all_runs:
-        if run.get("status") == "completed" and run.get("metrics"):
-            runs_by_prompt[run["prompt_id"]].append(run)
+    # One rescan of the runs directory serves every prompt below
+    index_version, total_runs = get_index_state()
 
     # Build summary for each prompt
     prompt_summaries: dict[str, dict[str, Any]] = {}
@@ -61,37 +140,24 @@ def get_summary() -> dict[str, Any]:
 
     for prompt in prompts:
         prompt_id = prompt["id"]
-        prompt_runs = runs_by_prompt.get(prompt_id, [])
-
-        if prompt_runs:
-            # Get latest run's accuracy
-            latest_run = max(prompt_runs, key=lambda r: r.get("created_at", ""))
-            latest_accuracy = latest_run["metrics"]["overall_accuracy"]
-
-            # Get best accuracy across all runs
-            best_run_accuracy = max(
-                r["metrics"]["overall_accuracy"] for r in prompt_runs
-            )
-
-            # Track overall best
-            if best_run_accuracy > best_accuracy:
-                best_accuracy = best_run_accuracy
-                best_prompt = prompt_id
-        else:
-            latest_accuracy = None
-            best_run_accuracy = None
+        latest_accuracy, best_run_accuracy, run_count = _get_run_stats(prompt_id, index_version)
+
+        # Track overall best
+        if best_run_accuracy is not None and best_run_accuracy > best_accuracy:
+            best_accuracy = best_run_accuracy
+            best_prompt = prompt_id
 
         prompt_summaries[prompt_id] = {
             "id": prompt_id,
             "name": prompt["name"],
             "latest_accuracy": latest_accuracy,
-            "run_count": len(prompt_runs),
+            "run_count": run_count,
             "best_accuracy": best_run_accuracy,
         }
 
     return {
         "prompts": prompt_summaries,
         "best_prompt": best_prompt,
-        "total_runs": len(all_runs),
+        "total_runs": total_runs,
         "test_set_size": test_set_info["total"],
     }
@@ -1,46 +1,131 @@
 """Service for managing prompt files."""
 
-import json
-from datetime import datetime, timezone
+import copy
+import functools
+import hashlib
+import os
+import re
+import time
 from pathlib import Path
 from typing import Any
 
+from src import jsonio
+from src.prompts import reload_prompts
+
 # Base path for prompt files
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 PROMPTS_DIR = DATA_DIR / "prompts"
 
+# Category definition lines such as "- SHIPPING: shipping options"
+_CATEGORY_RE = re.compile(r"^\s*-\s+([A-Z][A-Z0-9_]*)\s*:", re.MULTILINE)
+
+# Formatted date/time prefix for the current second, reused by _utcnow_iso
+_timestamp_prefix: tuple[int, str] = (-1, "")
+
+# Fields returned by list_prompts(summary=True)
+_SUMMARY_FIELDS = ("id", "name", "categories", "created_at", "updated_at")
+
+# Parsed prompt files keyed on path, validated against each file's mtime
+_prompt_cache: dict[Path, tuple[int, dict[str, Any]]] = {}
+
+# Prompt file listing, validated against the prompts directory's mtime
+_listing_cache: tuple[int, list[Path]] | None = None
+
 
 def _ensure_prompts_dir() -> None:
     """Ensure the prompts directory exists."""
     PROMPTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _utcnow_iso() -> str:
+    """Get the current UTC time as an ISO 8601 string with microseconds."""
+    global _timestamp_prefix
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_seconds, prefix = _timestamp_prefix
+    if seconds != cached_seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _timestamp_prefix = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}+00:00"
+
+
 def _get_prompt_path(prompt_id: str) -> Path:
     """Get the file path for a prompt."""
     return PROMPTS_DIR / f"{prompt_id}.json"
 
 
 def _load_prompt(path: Path) -> dict[str, Any]:
-    """Load a prompt from a JSON file."""
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Load a prompt from a JSON file, reusing the cached copy if unchanged."""
+    mtime = path.stat().st_mtime_ns
+    cached = _prompt_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, jsonio.loads(path.read_bytes()))
+        _prompt_cache[path] = cached
+    return copy.copy(cached[1])
 
 
 def _save_prompt(path: Path, data: dict[str, Any]) -> None:
-    """Save a prompt to a JSON file."""
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    """Save a prompt to a JSON file and refresh its cache entry."""
+    path.write_bytes(jsonio.dumps(data, indent=True))
+    _prompt_cache[path] = (path.stat().st_mtime_ns, copy.copy(data))
+    # Runs in this process render templates through src.prompts
+    reload_prompts(path.stem)
+
+
+def _list_prompt_paths() -> list[Path]:
+    """List prompt files, rescanning only when the directory changes."""
+    global _listing_cache
+    mtime = PROMPTS_DIR.stat().st_mtime_ns
+    cache = _listing_cache
+    if cache is None or cache[0] != mtime:
+        with os.scandir(PROMPTS_DIR) as entries:
+            paths = [
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            ]
+        cache = (mtime, paths)
+        _listing_cache = cache
+    return cache[1]
+
+
+def _invalidate_listing() -> None:
+    """Force the next listing to rescan the prompts directory."""
+    global _listing_cache
+    _listing_cache = None
+
+
+def get_prompts_etag() -> str:
+    """Get an ETag identifying the current prompt files and their versions."""
+    _ensure_prompts_dir()
+    state = []
+    for path in _list_prompt_paths():
+        try:
+            state.append(f"{path.name}:{path.stat().st_mtime_ns}")
+        except OSError:
+            continue
+    digest = hashlib.blake2b("\n".join(sorted(state)).encode(), digest_size=8)
+    return f'"{digest.hexdigest()}"'
+
 
+def list_prompts(summary: bool = False) -> list[dict[str, Any]]:
+    """List all prompts from the prompts directory.
 
-def list_prompts() -> list[dict[str, Any]]:
-    """List all prompts from the prompts directory."""
+    Args:
+        summary: Return only the metadata fields, without the template
+
+    Returns:
+        Prompts sorted by creation time
+    """
     _ensure_prompts_dir()
     prompts = []
-    for path in PROMPTS_DIR.glob("*.json"):
+    for path in _list_prompt_paths():
         try:
-            prompts.append(_load_prompt(path))
-        except (json.JSONDecodeError, IOError):
+            prompt = _load_prompt(path)
+        except (jsonio.JSONDecodeError, IOError):
             continue
+        if summary:
+            prompt = {key: prompt[key] for key in _SUMMARY_FIELDS if key in prompt}
+        prompts.append(prompt)
     return sorted(prompts, key=lambda p: p.get("created_at", ""))
 
 
@@ -51,7 +136,7 @@ def get_prompt(prompt_id: str) -> dict[str, Any] | None:
         return None
     try:
         return _load_prompt(path)
-    except (json.JSONDecodeError, IOError):
+    except (jsonio.JSONDecodeError, IOError):
         return None
 
 
@@ -66,7 +151,7 @@ def create_prompt(prompt_id: str, name: str, template: str) -> dict[str, Any]:
     # Extract categories from template (look for category list pattern)
     categories = _extract_categories(template)
 
-    now = datetime.now(timezone.utc).isoformat()
+    now = _utcnow_iso()
     data = {
         "id": prompt_id,
         "name": name,
@@ -77,6 +162,7 @@ def create_prompt(prompt_id: str, name: str, template: str) -> dict[str, Any]:
     }
 
     _save_prompt(path, data)
+    _invalidate_listing()
     return data
 
 
@@ -97,7 +183,7 @@ def update_prompt(
         data["template"] = template
         data["categories"] = _extract_categories(template)
 
-    data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    data["updated_at"] = _utcnow_iso()
 
     _save_prompt(path, data)
     return data
@@ -109,20 +195,18 @@ def delete_prompt(prompt_id: str) -> bool:
     if not path.exists():
         return False
     path.unlink()
+    _prompt_cache.pop(path, None)
+    reload_prompts(prompt_id)
+    _invalidate_listing()
     return True
 
 
 def _extract_categories(template: str) -> list[str]:
     """Extract category names from a prompt template."""
-    categories = []
-    lines = template.split("\n")
-
-    for line in lines:
-        line = line.strip()
-        # Look for lines starting with "- CATEGORY:" pattern
-        if line.startswith("- ") and ":" in line:
-            category_part = line[2:].split(":")[0].strip()
-            if category_part.isupper():
-                categories.append(category_part)
-
-    return categories
+    return list(_find_categories(template))
+
+
+@functools.lru_cache(maxsize=32)
+def _find_categories(template: str) -> tuple[str, ...]:
+    """Find "- CATEGORY:" lines in a template (memoized per template)."""
+    return tuple(_CATEGORY_RE.findall(template))
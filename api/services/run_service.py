@@ -1,17 +1,40 @@
 """Service for managing test runs and executing tests."""
 
-import json
-from collections import defaultdict
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Mapping
 
-from src.router import TicketRouter
+from api.services.test_set_service import load_test_set
+from src import jsonio
+from src.config import MAX_CONCURRENT_REQUESTS
+from src.prompts import reload_prompts
+from src.router import TicketRouter, get_default_router
 
 # Base paths
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 RUNS_DIR = DATA_DIR / "runs"
-TEST_SET_PATH = DATA_DIR / "test_set.json"
+RUN_RESULTS_DIR = RUNS_DIR / "results"
+
+# String forms of the run directories, used to build per-run file paths cheaply
+_RUNS_DIR_STR = str(RUNS_DIR)
+_RUN_RESULTS_DIR_STR = str(RUN_RESULTS_DIR)
+
+# In-memory run index, rebuilt when any run file changes on disk and kept in
+# sync by _save_run/_rewrite_run for writes made by this process
+_index_lock = threading.Lock()
+_indexed_mtimes: dict[str, int] = {}
+_runs_by_id: dict[str, dict[str, Any]] = {}
+_runs_by_prompt: dict[str, list[dict[str, Any]]] = {}
+_all_runs: list[dict[str, Any]] = []
+_index_version = 0
+
+# Parsed run headers keyed by path, validated against each file's mtime so a
+# rescan only re-reads files that actually changed
+_run_meta_cache: dict[str, tuple[int, dict[str, Any]]] = {}
 
 
 def _ensure_runs_dir() -> None:
@@ -19,21 +42,145 @@ def _ensure_runs_dir() -> None:
     RUNS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def _get_run_path(run_id: str) -> Path:
-    """Get the file path for a run."""
-    return RUNS_DIR / f"{run_id}.json"
+def _get_run_path(run_id: str) -> str:
+    """Get the file path for a run's header (everything except results)."""
+    return os.path.join(_RUNS_DIR_STR, run_id + ".json")
+
+
+def _get_run_results_path(run_id: str) -> str:
+    """Get the file path for a run's per-test results."""
+    return os.path.join(_RUN_RESULTS_DIR_STR, run_id + ".json")
 
 
-def _load_run(path: Path) -> dict[str, Any]:
+def _load_run(path: str) -> dict[str, Any]:
     """Load a run from a JSON file."""
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return jsonio.loads(f.read())
 
 
-def _save_run(path: Path, data: dict[str, Any]) -> None:
-    """Save a run to a JSON file."""
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+def _save_run(run_id: str, data: dict[str, Any]) -> None:
+    """Save a run header to a JSON file and update the run index."""
+    path = _get_run_path(run_id)
+    with open(path, "wb") as f:
+        f.write(jsonio.dumps(data))
+    mtime = os.stat(path).st_mtime_ns
+    with _index_lock:
+        _record_run(path, mtime, run_id, data)
+
+
+def _rewrite_run(header: BinaryIO, run_id: str, data: dict[str, Any]) -> None:
+    """Overwrite an already open run header file in place and update the run index."""
+    payload = memoryview(jsonio.dumps(data))
+    header.seek(0)
+    # The header is unbuffered, so a single write() may be partial
+    while payload:
+        payload = payload[header.write(payload) :]
+    header.truncate()
+    mtime = os.fstat(header.fileno()).st_mtime_ns
+    with _index_lock:
+        _record_run(header.name, mtime, run_id, data)
+
+
+def _save_run_results(run_id: str, results: list[dict[str, Any]]) -> None:
+    """Save a run's per-test results, written once when the run completes."""
+    RUN_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(_get_run_results_path(run_id), "wb") as f:
+        f.write(jsonio.dumps(results))
+
+
+def _sort_runs(runs: list[dict[str, Any]]) -> None:
+    """Sort runs newest first, in place."""
+    runs.sort(key=lambda r: r.get("created_at", ""), reverse=True)
+
+
+def _index_run(run_id: str, run: dict[str, Any], resort: bool = True) -> None:
+    """Insert or replace a run in the index. Caller must hold _index_lock."""
+    global _index_version
+    _index_version += 1
+    # Older run files embed results in the header; the index never needs them
+    run.pop("results", None)
+    previous = _runs_by_id.get(run_id)
+    if previous is not None:
+        siblings = _runs_by_prompt.get(previous.get("prompt_id"), [])
+        siblings[:] = [r for r in siblings if r is not previous]
+        _all_runs[:] = [r for r in _all_runs if r is not previous]
+    _runs_by_id[run_id] = run
+    siblings = _runs_by_prompt.setdefault(run.get("prompt_id"), [])
+    siblings.append(run)
+    _all_runs.append(run)
+    if resort:
+        _sort_runs(siblings)
+        _sort_runs(_all_runs)
+
+
+def _record_run(path: str, mtime: int, run_id: str, data: dict[str, Any]) -> None:
+    """Index a run this process just wrote. Caller must hold _index_lock."""
+    run = dict(data)
+    run.pop("results", None)
+    _run_meta_cache[path] = (mtime, run)
+    # Changes to any other file still fail the comparison in _ensure_index
+    _indexed_mtimes[path] = mtime
+    _index_run(run_id, dict(run))
+
+
+def _scan_run_mtimes() -> dict[str, int]:
+    """Stat every run header in the runs directory, keyed by path."""
+    mtimes = {}
+    with os.scandir(_RUNS_DIR_STR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json") or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime_ns
+            except FileNotFoundError:
+                continue
+    return mtimes
+
+
+def _ensure_index() -> None:
+    """Sync the run index with the runs directory, re-reading only changed files.
+
+    Every call stats each run file: a header rewritten in place (by another
+    worker, or by scripts/migrate_results.py) leaves the directory mtime
+    unchanged, so only per-file mtimes catch it.
+    """
+    _ensure_runs_dir()
+    mtimes = _scan_run_mtimes()
+    with _index_lock:
+        if mtimes == _indexed_mtimes:
+            return
+        _runs_by_id.clear()
+        _runs_by_prompt.clear()
+        _all_runs.clear()
+        for path, file_mtime in mtimes.items():
+            cached = _run_meta_cache.get(path)
+            if cached is not None and cached[0] == file_mtime:
+                run = cached[1]
+            else:
+                try:
+                    run = _load_run(path)
+                except (jsonio.JSONDecodeError, IOError):
+                    continue
+                run.pop("results", None)
+                _run_meta_cache[path] = (file_mtime, run)
+            _index_run(os.path.basename(path)[:-5], dict(run), resort=False)
+        for path in _run_meta_cache.keys() - mtimes.keys():
+            del _run_meta_cache[path]
+        for runs in _runs_by_prompt.values():
+            _sort_runs(runs)
+        _sort_runs(_all_runs)
+        _indexed_mtimes.clear()
+        _indexed_mtimes.update(mtimes)
+
+
+def get_index_state() -> tuple[int, int]:
+    """Return the index version and total run count from a single rescan.
+
+    The version is a counter that changes whenever a run is added or updated.
+    """
+    _ensure_index()
+    with _index_lock:
+        return _index_version, len(_all_runs)
 
 
 def _generate_run_id(prompt_id: str) -> str:
@@ -42,34 +189,54 @@ def _generate_run_id(prompt_id: str) -> str:
     return f"{prompt_id}_{timestamp}"
 
 
-def _load_test_set() -> list[dict[str, Any]]:
-    """Load the test set from JSON."""
-    with open(TEST_SET_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+def list_runs(
+    prompt_id: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+    rescan: bool = True,
+) -> list[dict[str, Any]]:
+    """List runs newest first, optionally filtered by prompt_id and paginated.
 
+    Returns copies, so callers cannot modify the index through them. Pass
+    rescan=False to read the index as of the caller's last get_index_state().
+    """
+    if rescan:
+        _ensure_index()
+    end = None if limit is None else offset + limit
+    with _index_lock:
+        runs = _all_runs if prompt_id is None else _runs_by_prompt.get(prompt_id, [])
+        return [dict(run) for run in runs[offset:end]]
 
-def list_runs(prompt_id: str | None = None) -> list[dict[str, Any]]:
-    """List all runs, optionally filtered by prompt_id."""
-    _ensure_runs_dir()
-    runs = []
-    for path in RUNS_DIR.glob("*.json"):
-        try:
-            run = _load_run(path)
-            if prompt_id is None or run.get("prompt_id") == prompt_id:
-                runs.append(run)
-        except (json.JSONDecodeError, IOError):
-            continue
-    return sorted(runs, key=lambda r: r.get("created_at", ""), reverse=True)
+
+def count_runs(prompt_id: str | None = None) -> int:
+    """Count runs, optionally filtered by prompt_id."""
+    _ensure_index()
+    with _index_lock:
+        if prompt_id is None:
+            return len(_all_runs)
+        return len(_runs_by_prompt.get(prompt_id, []))
 
 
 def get_run(run_id: str) -> dict[str, Any] | None:
     """Get a single run by ID."""
-    path = _get_run_path(run_id)
-    if not path.exists():
+    try:
+        return _load_run(_get_run_path(run_id))
+    except (jsonio.JSONDecodeError, IOError):
         return None
+
+
+def get_run_results(run_id: str) -> list[dict[str, Any]] | None:
+    """Get a run's per-test results, loading them from disk on demand."""
     try:
-        return _load_run(path)
-    except (json.JSONDecodeError, IOError):
+        return _load_run(_get_run_results_path(run_id))
+    except FileNotFoundError:
+        pass
+    except (jsonio.JSONDecodeError, IOError):
+        return None
+    # Older run files embed results in the header
+    try:
+        return _load_run(_get_run_path(run_id)).get("results")
+    except (jsonio.JSONDecodeError, IOError):
         return None
 
 
@@ -87,132 +254,156 @@ def create_run(prompt_id: str) -> dict[str, Any]:
         "completed_at": None,
         "metrics": None,
         "confusion_matrix": None,
-        "results": None,
         "failed_cases": None,
         "error": None,
     }
 
-    path = _get_run_path(run_id)
-    _save_run(path, run_data)
+    _save_run(run_id, run_data)
     return run_data
 
 
 def update_run_status(run_id: str, status: str) -> None:
     """Update a run's status."""
-    path = _get_run_path(run_id)
-    if path.exists():
-        run = _load_run(path)
-        run["status"] = status
-        _save_run(path, run)
+    try:
+        run = _load_run(_get_run_path(run_id))
+    except FileNotFoundError:
+        return
+    run["status"] = status
+    _save_run(run_id, run)
 
 
 def execute_run(run_id: str, prompt_id: str) -> None:
     """Execute a test run against all test cases."""
-    path = _get_run_path(run_id)
-
-    # Update status to running
-    run = _load_run(path)
-    run["status"] = "running"
-    _save_run(path, run)
-
-    try:
-        # Load test set
-        test_cases = _load_test_set()
-
-        # Initialize router
-        router = TicketRouter()
+    # Keep the header open for the whole run so each status change is an
+    # in-place rewrite rather than another open/close of the file
+    with open(_get_run_path(run_id), "r+b", buffering=0) as header:
+        # Update status to running (header only; results are written once at the end)
+        run = jsonio.loads(header.read())
+        run.pop("results", None)
+        run["status"] = "running"
+        _rewrite_run(header, run_id, run)
 
-        # Run all tests
-        results = []
-        for test_case in test_cases:
-            try:
-                predicted = router.route_ticket(
-                    ticket=test_case["ticket"],
-                    prompt_version=prompt_id,
-                    test_case_id=test_case["id"],
-                    expected_category=test_case["expected"],
+        try:
+            # Load test set
+            test_cases = load_test_set()
+
+            # Evaluate the template currently on disk, the one GET /prompts shows,
+            # even if the file was added or edited outside prompt_service
+            reload_prompts(prompt_id)
+
+            # Shared router, so Maitai clients are reused across runs
+            router = get_default_router()
+
+            # Run all tests concurrently; map() keeps results in test set order
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+                results = list(
+                    executor.map(
+                        lambda test_case: _run_test_case(router, prompt_id, test_case),
+                        test_cases,
+                    )
                 )
-                results.append({
-                    "test_id": test_case["id"],
-                    "ticket": test_case["ticket"],
-                    "expected": test_case["expected"],
-                    "predicted": predicted,
-                    "correct": predicted == test_case["expected"],
-                })
-            except Exception as e:
-                results.append({
-                    "test_id": test_case["id"],
-                    "ticket": test_case["ticket"],
-                    "expected": test_case["expected"],
-                    "predicted": None,
-                    "correct": False,
-                    "error": str(e),
-                })
-
-        # Calculate metrics
-        metrics = _calculate_metrics(results)
-        confusion_matrix = _calculate_confusion_matrix(results)
-        failed_cases = _extract_failed_cases(results)
-
-        # Update run with results
-        run["status"] = "completed"
-        run["completed_at"] = datetime.now(timezone.utc).isoformat()
-        run["metrics"] = metrics
-        run["confusion_matrix"] = confusion_matrix
-        run["results"] = results
-        run["failed_cases"] = failed_cases
-        _save_run(path, run)
 
+            # Calculate metrics
+            metrics, confusion_matrix, failed_cases = _summarize_results(results)
+
+            # Write results before the header marks the run completed
+            _save_run_results(run_id, results)
+
+            # Update run header with summary data
+            run["status"] = "completed"
+            run["completed_at"] = datetime.now(timezone.utc).isoformat()
+            run["metrics"] = metrics
+            run["confusion_matrix"] = confusion_matrix
+            run["failed_cases"] = failed_cases
+            _rewrite_run(header, run_id, run)
+
+        except Exception as e:
+            # Mark as failed
+            run["status"] = "failed"
+            run["error"] = str(e)
+            run["completed_at"] = datetime.now(timezone.utc).isoformat()
+            _rewrite_run(header, run_id, run)
+            raise
+
+
+def _run_test_case(
+    router: TicketRouter, prompt_id: str, test_case: Mapping[str, Any]
+) -> dict[str, Any]:
+    """Route a single test case and record the outcome."""
+    try:
+        predicted = router.route_ticket(
+            ticket=test_case["ticket"],
+            prompt_version=prompt_id,
+            test_case_id=test_case["id"],
+            expected_category=test_case["expected"],
+        )
+        return {
+            "test_id": test_case["id"],
+            "ticket": test_case["ticket"],
+            "expected": test_case["expected"],
+            "predicted": predicted,
+            "correct": predicted == test_case["expected"],
+        }
     except Exception as e:
-        # Mark as failed
-        run["status"] = "failed"
-        run["error"] = str(e)
-        run["completed_at"] = datetime.now(timezone.utc).isoformat()
-        _save_run(path, run)
-        raise
+        return {
+            "test_id": test_case["id"],
+            "ticket": test_case["ticket"],
+            "expected": test_case["expected"],
+            "predicted": None,
+            "correct": False,
+            "error": str(e),
+        }
 
 
-def _calculate_metrics(results: list[dict[str, Any]]) -> dict[str, Any]:
-    """Calculate accuracy metrics from results."""
-    total = len(results)
-    correct = sum(1 for r in results if r.get("correct", False))
+def _summarize_results(
+    results: list[dict[str, Any]],
+) -> tuple[dict[str, Any], dict[str, dict[str, int]], list[dict[str, Any]]]:
+    """Compute metrics, confusion matrix and failed cases in one pass over results."""
+    tally: Counter[tuple[str, str | None]] = Counter()
+    failed_cases = []
+    for r in results:
+        tally[r.get("expected", "UNKNOWN"), r.get("predicted")] += 1
+        if not r.get("correct", False):
+            failed_cases.append(
+                {
+                    "test_id": r["test_id"],
+                    "ticket": r["ticket"],
+                    "expected": r["expected"],
+                    "predicted": r.get("predicted", "ERROR"),
+                }
+            )
+    return _calculate_metrics(tally), _calculate_confusion_matrix(tally), failed_cases
+
+
+def _calculate_metrics(tally: Counter[tuple[str, str | None]]) -> dict[str, Any]:
+    """Calculate accuracy metrics from an outcome tally."""
+    total = 0
+    correct = 0
 
     # Per-category stats
-    category_stats: dict[str, dict[str, int]] = defaultdict(lambda: {"total": 0, "correct": 0})
-    for r in results:
-        expected = r.get("expected", "UNKNOWN")
-        category_stats[expected]["total"] += 1
-        if r.get("correct", False):
-            category_stats[expected]["correct"] += 1
+    category_stats: dict[str, dict[str, int]] = {}
+    for (expected, predicted), count in tally.items():
+        stats = category_stats.setdefault(expected, {"total": 0, "correct": 0})
+        stats["total"] += count
+        total += count
+        if predicted == expected:
+            stats["correct"] += count
+            correct += count
 
     return {
         "overall_accuracy": correct / total if total > 0 else 0,
         "correct": correct,
         "total": total,
-        "category_stats": dict(category_stats),
+        "category_stats": category_stats,
     }
 
 
-def _calculate_confusion_matrix(results: list[dict[str, Any]]) -> dict[str, dict[str, int]]:
-    """Build confusion matrix of actual vs predicted categories."""
-    matrix: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
-    for r in results:
-        expected = r.get("expected", "UNKNOWN")
-        predicted = r.get("predicted", "UNKNOWN")
+def _calculate_confusion_matrix(
+    tally: Counter[tuple[str, str | None]],
+) -> dict[str, dict[str, int]]:
+    """Build confusion matrix of actual vs predicted categories from an outcome tally."""
+    matrix: dict[str, dict[str, int]] = {}
+    for (expected, predicted), count in tally.items():
         if predicted is not None:
-            matrix[expected][predicted] += 1
-    return {k: dict(v) for k, v in matrix.items()}
-
-
-def _extract_failed_cases(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Extract failed test cases for analysis."""
-    return [
-        {
-            "test_id": r["test_id"],
-            "ticket": r["ticket"],
-            "expected": r["expected"],
-            "predicted": r.get("predicted", "ERROR"),
-        }
-        for r in results
-        if not r.get("correct", False)
-    ]
+            matrix.setdefault(expected, {})[predicted] = count
+    return matrix
@@ -0,0 +1,39 @@
+"""Service for loading the shared test set."""
+
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from src import jsonio
+
+# Base paths
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+TEST_SET_PATH = DATA_DIR / "test_set.json"
+
+# Parsed test set keyed on the file's mtime, as read-only views shared by
+# every caller
+_test_set_cache: tuple[int, tuple[Mapping[str, Any], ...]] | None = None
+
+
+def invalidate() -> None:
+    """Drop the cached test set so the next access re-reads it from disk."""
+    global _test_set_cache
+    _test_set_cache = None
+
+
+def load_test_set() -> tuple[Mapping[str, Any], ...]:
+    """Load the test set from JSON, re-reading only when the file changes.
+
+    Cases are read-only views, since the same objects are handed to every
+    caller; a new tuple is returned after the file changes.
+    """
+    global _test_set_cache
+    mtime = TEST_SET_PATH.stat().st_mtime_ns
+    cache = _test_set_cache
+    if cache is None or cache[0] != mtime:
+        test_cases = tuple(
+            MappingProxyType(case) for case in jsonio.loads(TEST_SET_PATH.read_bytes())
+        )
+        cache = (mtime, test_cases)
+        _test_set_cache = cache
+    return cache[1]
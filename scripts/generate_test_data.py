@@ -1,54 +1,65 @@
 """Generate test data from Bitext Hugging Face dataset."""
 
-import json
-import random
+import sys
 from pathlib import Path
 from collections import defaultdict
 
-from datasets import load_dataset
+import numpy as np
+from datasets import Dataset, load_dataset
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def load_bitext_dataset() -> list[dict]:
+from src import jsonio
+
+
+def load_bitext_dataset() -> Dataset:
     """Load Bitext customer support dataset from Hugging Face.
 
     Returns:
-        List of all examples from the dataset
+        The dataset's train split, kept as an Arrow-backed Dataset
     """
     print("Loading Bitext dataset from Hugging Face...")
     ds = load_dataset("bitext/Bitext-customer-support-llm-chatbot-training-dataset")
-    return list(ds["train"])
+    return ds["train"]
 
 
-def sample_balanced(data: list[dict], samples_per_category: int = 18) -> list[dict]:
+def sample_balanced(
+    data: Dataset, rng: np.random.Generator, samples_per_category: int = 18
+) -> Dataset:
     """Sample balanced examples across all categories.
 
+    Only the category column is pulled out of the dataset; the chosen rows
+    are gathered by index at the end.
+
     Args:
         data: Full dataset
+        rng: Random generator used for sampling
         samples_per_category: Number of samples per category (18 * 11 = 198, close to 200)
 
     Returns:
         Balanced sample of examples
     """
-    # Group by category
-    by_category: dict[str, list[dict]] = defaultdict(list)
-    for item in data:
-        by_category[item["category"]].append(item)
+    categories = np.asarray(data["category"])
+    names, counts = np.unique(categories, return_counts=True)
 
-    print(f"\nDataset categories ({len(by_category)}):")
-    for cat, items in sorted(by_category.items()):
-        print(f"  {cat}: {len(items)} examples")
+    print(f"\nDataset categories ({len(names)}):")
+    for cat, count in zip(names, counts):
+        print(f"  {cat}: {count} examples")
 
-    # Sample from each category
-    sampled = []
-    for category, items in by_category.items():
-        n = min(samples_per_category, len(items))
-        sampled.extend(random.sample(items, n))
+    # Sample row indices from each category, then shuffle them together
+    per_category = []
+    for category in names:
+        indices = np.flatnonzero(categories == category)
+        n = min(samples_per_category, indices.size)
+        per_category.append(rng.choice(indices, size=n, replace=False))
 
-    random.shuffle(sampled)
-    return sampled
+    chosen = np.concatenate(per_category)
+    rng.shuffle(chosen)
+    return data.select(chosen)
 
 
-def format_test_cases(sampled: list[dict]) -> list[dict]:
+def format_test_cases(sampled: Dataset) -> list[dict]:
     """Format sampled data into test case format.
 
     Args:
@@ -57,16 +68,15 @@ def format_test_cases(sampled: list[dict]) -> list[dict]:
     Returns:
         List of formatted test cases
     """
-    test_cases = []
-    for i, item in enumerate(sampled, 1):
-        test_case = {
-            "id": i,
-            "ticket": item["instruction"],
-            "expected": item["category"],
-            "intent": item["intent"],
-        }
-        test_cases.append(test_case)
-    return test_cases
+    return [
+        {"id": i, "ticket": ticket, "expected": category, "intent": intent}
+        for i, ticket, category, intent in zip(
+            range(1, len(sampled) + 1),
+            sampled["instruction"],
+            sampled["category"],
+            sampled["intent"],
+        )
+    ]
 
 
 def save_test_set(test_cases: list[dict], output_path: Path) -> None:
@@ -77,8 +87,7 @@ def save_test_set(test_cases: list[dict], output_path: Path) -> None:
         output_path: Path to output JSON file
     """
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(test_cases, f, indent=2, ensure_ascii=False)
+    output_path.write_bytes(jsonio.dumps(test_cases, indent=True))
     print(f"\nSaved {len(test_cases)} test cases to {output_path}")
 
 
@@ -99,14 +108,14 @@ def print_summary(test_cases: list[dict]) -> None:
 
 def main() -> None:
     """Generate test data from Bitext dataset."""
-    random.seed(42)  # For reproducibility
+    rng = np.random.default_rng(42)  # For reproducibility
 
     # Load dataset
     data = load_bitext_dataset()
     print(f"Loaded {len(data)} examples")
 
     # Sample balanced subset
-    sampled = sample_balanced(data, samples_per_category=18)
+    sampled = sample_balanced(data, rng, samples_per_category=18)
 
     # Format as test cases
     test_cases = format_test_cases(sampled)
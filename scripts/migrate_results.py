@@ -1,23 +1,31 @@
 """Migrate existing results files to new data/runs/ format."""
 
-import json
+import os
+import sys
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter
 from datetime import datetime
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import jsonio
+
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
 RESULTS_DIR = PROJECT_ROOT
 RUNS_DIR = PROJECT_ROOT / "data" / "runs"
+RUN_RESULTS_DIR = RUNS_DIR / "results"
 
 
 def calculate_confusion_matrix(results: list[dict]) -> dict:
     """Build matrix of actual vs predicted categories."""
-    matrix = defaultdict(lambda: defaultdict(int))
-    for r in results:
-        matrix[r["expected"]][r["predicted"]] += 1
-    # Convert to regular dict
-    return {k: dict(v) for k, v in matrix.items()}
+    # Count pairs first so the nested dicts are built directly as plain dicts
+    pairs = Counter((r["expected"], r["predicted"]) for r in results)
+    matrix: dict[str, dict[str, int]] = {}
+    for (expected, predicted), count in pairs.items():
+        matrix.setdefault(expected, {})[predicted] = count
+    return matrix
 
 
 def get_failed_cases(results: list[dict]) -> list[dict]:
@@ -42,8 +50,7 @@ def migrate_results_file(version: str) -> None:
         print(f"Skipping {version}: file not found")
         return
 
-    with open(old_path, "r", encoding="utf-8") as f:
-        old_data = json.load(f)
+    old_data = jsonio.loads(old_path.read_bytes())
 
     # Generate new run ID with timestamp
     run_id = f"{version}_2024-01-15_001"
@@ -58,28 +65,55 @@ def migrate_results_file(version: str) -> None:
         "status": "completed",
         "metrics": old_data["metrics"],
         "confusion_matrix": calculate_confusion_matrix(old_data["results"]),
-        "results": old_data["results"],
         "failed_cases": get_failed_cases(old_data["results"]),
     }
 
-    with open(new_path, "w", encoding="utf-8") as f:
-        json.dump(new_data, f, indent=2, ensure_ascii=False)
+    # Results live in their own file so listing runs never has to parse them
+    (RUN_RESULTS_DIR / f"{run_id}.json").write_bytes(jsonio.dumps(old_data["results"]))
+    new_path.write_bytes(jsonio.dumps(new_data))
 
     print(f"Migrated {version}: {old_path} -> {new_path}")
     print(f"  - {len(new_data['failed_cases'])} failed cases")
     print(f"  - Confusion matrix: {len(new_data['confusion_matrix'])} categories")
 
 
+def split_run_file(path: str) -> bool:
+    """Move results embedded in a run header into the run's results file.
+
+    Returns:
+        True if the run file was rewritten
+    """
+    with open(path, "rb") as f:
+        run = jsonio.loads(f.read())
+    if "results" not in run:
+        return False
+
+    results = run.pop("results")
+    results_path = RUN_RESULTS_DIR / os.path.basename(path)
+    if not results_path.exists():
+        results_path.write_bytes(jsonio.dumps(results))
+    with open(path, "wb") as f:
+        f.write(jsonio.dumps(run))
+    return True
+
+
 def main() -> None:
     """Migrate all results files."""
     print("Migrating results to new format...\n")
 
-    # Ensure runs directory exists
-    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    # Ensure runs directories exist
+    RUN_RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
     for version in ["v1", "v2", "v3"]:
         migrate_results_file(version)
 
+    # Split older run files that still embed their results
+    with os.scandir(RUNS_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False):
+                if split_run_file(entry.path):
+                    print(f"Split results out of {entry.name}")
+
     print("\nMigration complete!")
 
 
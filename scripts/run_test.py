@@ -1,68 +1,117 @@
 """Unified test runner for prompt regression testing."""
 
 import argparse
-import json
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter
+
+# Paths
+PROJECT_ROOT = Path(__file__).parent.parent
+TEST_SET_PATH = PROJECT_ROOT / "data" / "test_set.json"
+BASELINE_PATH = PROJECT_ROOT / "results_v1.json"
 
 # Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(PROJECT_ROOT))
 
+from src import jsonio
+from src.config import MAX_CONCURRENT_REQUESTS
 from src.router import TicketRouter
 
-# Rate limit: 50 requests/min = 1.2s minimum between requests
-REQUEST_DELAY = 0.1
+# Rate limit: 50 requests/min shared by all workers, with short bursts allowed
+REQUESTS_PER_MINUTE = 50
+REQUEST_BURST = 5
+
+
+class TokenBucket:
+    """Thread-safe token bucket that spaces requests to a steady rate."""
+
+    def __init__(self, rate_per_sec: float, capacity: int) -> None:
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_sec)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate_per_sec
+            time.sleep(wait)
 
 
 def load_test_set(path: Path) -> list[dict]:
     """Load test cases from JSON file."""
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return jsonio.loads(path.read_bytes())
 
 
 def load_results(path: Path) -> dict | None:
     """Load existing results for comparison."""
     if not path.exists():
         return None
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return jsonio.loads(path.read_bytes())
+
+
+def run_single_test(
+    router: TicketRouter,
+    bucket: TokenBucket,
+    test: dict,
+    prompt_version: str,
+    use_cache: bool = False,
+) -> dict:
+    """Route one test case and build its result record."""
+    predicted = router.route_ticket(
+        ticket=test["ticket"],
+        prompt_version=prompt_version,
+        test_case_id=test["id"],
+        expected_category=test["expected"],
+        use_cache=use_cache,
+        rate_limit=bucket.acquire,  # Cache hits skip the rate limit
+    )
+
+    return {
+        "test_id": test["id"],
+        "ticket": test["ticket"],
+        "expected": test["expected"],
+        "predicted": predicted,
+        "correct": predicted == test["expected"],
+        "intent": test.get("intent", ""),
+    }
 
 
-def run_test(test_set: list[dict], prompt_version: str) -> list[dict]:
+def run_test(test_set: list[dict], prompt_version: str, use_cache: bool = False) -> list[dict]:
     """Execute test run for given prompt version."""
     router = TicketRouter()
-    results = []
+    bucket = TokenBucket(rate_per_sec=REQUESTS_PER_MINUTE / 60, capacity=REQUEST_BURST)
+    results: list[dict | None] = [None] * len(test_set)
 
     print(f"\nRunning test with prompt {prompt_version}...")
-    print(f"Testing {len(test_set)} cases...\n")
-
-    for i, test in enumerate(test_set, 1):
-        predicted = router.route_ticket(
-            ticket=test["ticket"],
-            prompt_version=prompt_version,
-            test_case_id=test["id"],
-            expected_category=test["expected"],
-        )
-        time.sleep(REQUEST_DELAY)  # Rate limit
-
-        correct = predicted == test["expected"]
-
-        result = {
-            "test_id": test["id"],
-            "ticket": test["ticket"],
-            "expected": test["expected"],
-            "predicted": predicted,
-            "correct": correct,
-            "intent": test.get("intent", ""),
+    print(f"Testing {len(test_set)} cases ({MAX_CONCURRENT_REQUESTS} concurrent)...\n")
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        futures = {
+            executor.submit(run_single_test, router, bucket, test, prompt_version, use_cache): index
+            for index, test in enumerate(test_set)
         }
-        results.append(result)
 
-        # Progress indicator
-        status = "✓" if correct else "✗"
-        if i % 10 == 0 or not correct:
-            print(f"  [{i}/{len(test_set)}] {status} Expected: {test['expected']}, Got: {predicted}")
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results[futures[future]] = result
+
+            # Progress indicator
+            status = "✓" if result["correct"] else "✗"
+            if done % 10 == 0 or not result["correct"]:
+                print(f"  [{done}/{len(test_set)}] {status} Expected: {result['expected']}, Got: {result['predicted']}")
 
     return results
 
@@ -70,22 +119,20 @@ def run_test(test_set: list[dict], prompt_version: str) -> list[dict]:
 def calculate_metrics(results: list[dict]) -> dict:
     """Calculate accuracy and per-category metrics."""
     total = len(results)
-    correct = sum(1 for r in results if r["correct"])
+    totals = Counter(result["expected"] for result in results)
+    corrects = Counter(result["expected"] for result in results if result["correct"])
+    correct = sum(corrects.values())
     accuracy = correct / total if total > 0 else 0
 
-    category_stats: dict[str, dict] = defaultdict(lambda: {"total": 0, "correct": 0})
-
-    for result in results:
-        cat = result["expected"]
-        category_stats[cat]["total"] += 1
-        if result["correct"]:
-            category_stats[cat]["correct"] += 1
+    category_stats = {
+        cat: {"total": count, "correct": corrects[cat]} for cat, count in totals.items()
+    }
 
     return {
         "overall_accuracy": accuracy,
         "correct": correct,
         "total": total,
-        "category_stats": dict(category_stats),
+        "category_stats": category_stats,
     }
 
 
@@ -110,6 +157,12 @@ def compare_to_baseline(current_metrics: dict, baseline: dict, prompt_version: s
     current_accuracy = current_metrics["overall_accuracy"]
     diff = current_accuracy - baseline_accuracy
 
+    # Baseline outcome per test ID, split once so each lookup is a set test
+    baseline_correct_ids = set()
+    baseline_failed_ids = set()
+    for r in baseline["results"]:
+        (baseline_correct_ids if r["correct"] else baseline_failed_ids).add(r["test_id"])
+
     print(f"\n{'='*60}")
     print(f"COMPARISON TO BASELINE (v1)")
     print(f"{'='*60}")
@@ -122,12 +175,9 @@ def compare_to_baseline(current_metrics: dict, baseline: dict, prompt_version: s
         print(f"Accuracy dropped by {abs(diff)*100:.1f}%")
 
         # Find newly failed cases
-        baseline_results = {r["test_id"]: r for r in baseline["results"]}
-        new_failures = []
-        for r in results:
-            baseline_result = baseline_results.get(r["test_id"])
-            if baseline_result and not r["correct"] and baseline_result["correct"]:
-                new_failures.append(r)
+        new_failures = [
+            r for r in results if not r["correct"] and r["test_id"] in baseline_correct_ids
+        ]
 
         if new_failures:
             print(f"\nNewly Failed Cases ({len(new_failures)}):")
@@ -140,12 +190,7 @@ def compare_to_baseline(current_metrics: dict, baseline: dict, prompt_version: s
         print(f"Accuracy improved by {diff*100:.1f}%")
 
         # Find newly fixed cases
-        baseline_results = {r["test_id"]: r for r in baseline["results"]}
-        new_fixes = []
-        for r in results:
-            baseline_result = baseline_results.get(r["test_id"])
-            if baseline_result and r["correct"] and not baseline_result["correct"]:
-                new_fixes.append(r)
+        new_fixes = [r for r in results if r["correct"] and r["test_id"] in baseline_failed_ids]
 
         if new_fixes:
             print(f"\nNewly Fixed Cases ({len(new_fixes)}):")
@@ -166,8 +211,7 @@ def save_results(results: list[dict], metrics: dict, prompt_version: str, output
         "results": results,
     }
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    output_path.write_bytes(jsonio.dumps(output, indent=True))
 
     print(f"Results saved to {output_path}")
 
@@ -194,19 +238,22 @@ def main() -> None:
         required=True,
         help="Prompt version to test",
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse categories cached from earlier runs with the same model and prompt",
+    )
     args = parser.parse_args()
 
     # Paths
-    test_set_path = Path(__file__).parent.parent / "data" / "test_set.json"
-    results_path = Path(__file__).parent.parent / f"results_{args.version}.json"
-    baseline_path = Path(__file__).parent.parent / "results_v1.json"
+    results_path = PROJECT_ROOT / f"results_{args.version}.json"
 
     # Load test set
-    print(f"Loading test set from {test_set_path}")
-    test_set = load_test_set(test_set_path)
+    print(f"Loading test set from {TEST_SET_PATH}")
+    test_set = load_test_set(TEST_SET_PATH)
 
     # Run test
-    results = run_test(test_set, args.version)
+    results = run_test(test_set, args.version, use_cache=args.cache)
 
     # Calculate metrics
     metrics = calculate_metrics(results)
@@ -222,7 +269,7 @@ def main() -> None:
 
     # Compare to baseline (if not v1)
     if args.version != "v1":
-        baseline = load_results(baseline_path)
+        baseline = load_results(BASELINE_PATH)
         if baseline:
             compare_to_baseline(metrics, baseline, args.version, results)
         else:
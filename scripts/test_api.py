@@ -1,19 +1,25 @@
 """Test script to validate all API endpoints."""
 
 import requests
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:8000"
 
+# One keep-alive connection pool shared by every request in the suite
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 
 def test_health():
     """Test health endpoints."""
     print("\n=== Health Checks ===")
 
-    r = requests.get(f"{BASE_URL}/")
+    r = SESSION.get(f"{BASE_URL}/")
     print(f"GET /: {r.status_code} - {r.json()}")
     assert r.status_code == 200
 
-    r = requests.get(f"{BASE_URL}/health")
+    r = SESSION.get(f"{BASE_URL}/health")
     print(f"GET /health: {r.status_code} - {r.json()}")
     assert r.status_code == 200
 
@@ -23,12 +29,12 @@ def test_prompts():
     print("\n=== Prompts ===")
 
     # List prompts
-    r = requests.get(f"{BASE_URL}/prompts")
+    r = SESSION.get(f"{BASE_URL}/prompts")
     print(f"GET /prompts: {r.status_code} - {len(r.json()['prompts'])} prompts")
     assert r.status_code == 200
 
     # Get single prompt
-    r = requests.get(f"{BASE_URL}/prompts/v1")
+    r = SESSION.get(f"{BASE_URL}/prompts/v1")
     print(f"GET /prompts/v1: {r.status_code} - {r.json()['name']}")
     assert r.status_code == 200
 
@@ -38,17 +44,17 @@ def test_prompts():
         "name": "Test Prompt",
         "template": "Classify: {ticket}\nCategory:"
     }
-    r = requests.post(f"{BASE_URL}/prompts", json=new_prompt)
+    r = SESSION.post(f"{BASE_URL}/prompts", json=new_prompt)
     print(f"POST /prompts: {r.status_code} - created '{r.json()['id']}'")
     assert r.status_code == 201
 
     # Update prompt
-    r = requests.put(f"{BASE_URL}/prompts/test-prompt", json={"name": "Updated Test"})
+    r = SESSION.put(f"{BASE_URL}/prompts/test-prompt", json={"name": "Updated Test"})
     print(f"PUT /prompts/test-prompt: {r.status_code} - name is now '{r.json()['name']}'")
     assert r.status_code == 200
 
     # Delete prompt
-    r = requests.delete(f"{BASE_URL}/prompts/test-prompt")
+    r = SESSION.delete(f"{BASE_URL}/prompts/test-prompt")
     print(f"DELETE /prompts/test-prompt: {r.status_code}")
     assert r.status_code == 204
 
@@ -58,12 +64,12 @@ def test_runs():
     print("\n=== Runs ===")
 
     # List runs
-    r = requests.get(f"{BASE_URL}/runs")
+    r = SESSION.get(f"{BASE_URL}/runs")
     print(f"GET /runs: {r.status_code} - {len(r.json()['runs'])} runs")
     assert r.status_code == 200
 
     # List runs filtered by prompt
-    r = requests.get(f"{BASE_URL}/runs?prompt_id=v1")
+    r = SESSION.get(f"{BASE_URL}/runs?prompt_id=v1")
     print(f"GET /runs?prompt_id=v1: {r.status_code} - {len(r.json()['runs'])} runs for v1")
     assert r.status_code == 200
 
@@ -74,7 +80,7 @@ def test_metrics():
     """Test metrics endpoint."""
     print("\n=== Metrics ===")
 
-    r = requests.get(f"{BASE_URL}/metrics/summary")
+    r = SESSION.get(f"{BASE_URL}/metrics/summary")
     data = r.json()
     print(f"GET /metrics/summary: {r.status_code}")
     print(f"  - Total runs: {data['total_runs']}")
@@ -88,7 +94,7 @@ def test_test_set():
     print("\n=== Test Set ===")
 
     # Get info
-    r = requests.get(f"{BASE_URL}/test-set")
+    r = SESSION.get(f"{BASE_URL}/test-set")
     data = r.json()
     print(f"GET /test-set: {r.status_code}")
     print(f"  - Total cases: {data['total']}")
@@ -96,7 +102,7 @@ def test_test_set():
     assert r.status_code == 200
 
     # Get cases with filter
-    r = requests.get(f"{BASE_URL}/test-set/cases?category=SHIPPING&limit=5")
+    r = SESSION.get(f"{BASE_URL}/test-set/cases?category=SHIPPING&limit=5")
     data = r.json()
     print(f"GET /test-set/cases?category=SHIPPING&limit=5: {r.status_code} - {len(data['cases'])} cases")
     assert r.status_code == 200
@@ -118,7 +124,7 @@ def test_suggest():
     }
 
     try:
-        r = requests.post(f"{BASE_URL}/suggest", json=payload, timeout=30)
+        r = SESSION.post(f"{BASE_URL}/suggest", json=payload, timeout=30)
         if r.status_code == 200:
             data = r.json()
             print(f"POST /suggest: {r.status_code}")
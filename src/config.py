@@ -1,6 +1,8 @@
 """Configuration module for support ticket router."""
 
 import os
+from pathlib import Path
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +14,23 @@ ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
 # Model Configuration
 MODEL_NAME: str = "claude-3-7-sonnet-latest"
 
+# Token cap for routing replies; only lower it after an eval run on every prompt
+ROUTE_MAX_TOKENS: int = int(os.getenv("ROUTE_MAX_TOKENS", "50"))
+
 # Maitai Organization
 APPLICATION_NAME: str = "support-ticket-router"
 INTENT_NAME: str = "route_ticket"
+
+# Concurrency: max in-flight routing requests during a test run
+MAX_CONCURRENT_REQUESTS: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "10"))
+
+# Retries for transient Maitai errors (connection failures, 429, 5xx), with
+# exponential backoff and full jitter between attempts
+MAX_RETRIES: int = int(os.getenv("MAX_RETRIES", "4"))
+RETRY_BASE_DELAY: float = 0.5
+RETRY_MAX_DELAY: float = 8.0
+
+# Persistent cache of routing decisions, used when routing with use_cache=True
+ROUTE_CACHE_PATH: Path = Path(
+    os.getenv("ROUTE_CACHE_PATH", Path(__file__).parent.parent / "data" / "route_cache.sqlite3")
+)
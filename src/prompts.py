@@ -1,7 +1,11 @@
 """Prompt templates for customer support ticket classification."""
 
-import json
+import os
 from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+
+from . import jsonio
 
 # Path to prompts directory
 DATA_DIR = Path(__file__).parent.parent / "data"
@@ -22,6 +26,21 @@ CATEGORIES = [
     "SUBSCRIPTION",
 ]
 
+# O(1) membership checks for validating a category name
+CATEGORY_SET: frozenset[str] = frozenset(CATEGORIES)
+
+# Placeholder substituted for {ticket} when splitting a template into parts
+_TICKET_MARKER = "\x00ticket\x00"
+
+# Templates by prompt ID, loaded from PROMPTS_DIR at import and refreshed by
+# reload_prompts(); TEMPLATES is the read-only view handed to callers
+_templates: dict[str, str] = {}
+TEMPLATES: Mapping[str, str] = MappingProxyType(_templates)
+
+# Template text split around {ticket}, as str and as UTF-8 bytes, keyed on
+# prompt ID along with the template it was built from
+_template_parts_cache: dict[str, tuple[str, tuple[str, ...], tuple[bytes, ...]]] = {}
+
 
 def _load_prompt_template(prompt_id: str) -> str | None:
     """Load a prompt template from JSON file."""
@@ -29,18 +48,81 @@ def _load_prompt_template(prompt_id: str) -> str | None:
     if not path.exists():
         return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = jsonio.loads(path.read_bytes())
         return data.get("template")
-    except (json.JSONDecodeError, IOError):
+    except (jsonio.JSONDecodeError, IOError):
         return None
 
 
-def get_available_prompts() -> list[str]:
-    """Get list of available prompt IDs."""
+def _scan_prompt_ids() -> list[str]:
+    """List the prompt IDs present in the prompts directory."""
     if not PROMPTS_DIR.exists():
         return []
-    return [p.stem for p in PROMPTS_DIR.glob("*.json")]
+    with os.scandir(PROMPTS_DIR) as entries:
+        return [
+            entry.name[:-5]
+            for entry in entries
+            if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False)
+        ]
+
+
+def reload_prompts(prompt_id: str | None = None) -> None:
+    """Re-read prompt templates from disk.
+
+    prompt_service reloads the prompts it writes; call this after editing
+    prompt files by hand while a process is running.
+
+    Args:
+        prompt_id: Prompt to reload, or None to rescan the whole directory
+    """
+    if prompt_id is not None:
+        template = _load_prompt_template(prompt_id)
+        if template is None:
+            _templates.pop(prompt_id, None)
+        else:
+            _templates[prompt_id] = template
+        return
+
+    templates = {}
+    for scanned_id in _scan_prompt_ids():
+        template = _load_prompt_template(scanned_id)
+        if template is not None:
+            templates[scanned_id] = template
+    for stale_id in _templates.keys() - templates.keys():
+        _templates.pop(stale_id, None)
+    _templates.update(templates)
+
+
+def _get_template_parts(prompt_id: str) -> tuple[tuple[str, ...], tuple[bytes, ...]] | None:
+    """Get a prompt template pre-formatted and split around {ticket}, as str and bytes."""
+    template = _templates.get(prompt_id)
+    if template is None:
+        return None
+    cached = _template_parts_cache.get(prompt_id)
+    if cached is not None and cached[0] is template:
+        return cached[1], cached[2]
+    # Formatting once resolves escaped braces, so callers only need to join
+    parts = tuple(template.format(ticket=_TICKET_MARKER).split(_TICKET_MARKER))
+    encoded = tuple(part.encode("utf-8") for part in parts)
+    _template_parts_cache[prompt_id] = (template, parts, encoded)
+    return parts, encoded
+
+
+def _require_template_parts(version: str) -> tuple[tuple[str, ...], tuple[bytes, ...]]:
+    """Get template parts for a prompt version, raising if it does not exist."""
+    parts = _get_template_parts(version)
+    if parts is None:
+        # The prompt file may have been added since templates were loaded
+        reload_prompts(version)
+        parts = _get_template_parts(version)
+    if parts is None:
+        raise ValueError(f"Unknown prompt version: {version}. Available: {list(TEMPLATES)}")
+    return parts
+
+
+def get_available_prompts() -> list[str]:
+    """Get list of available prompt IDs."""
+    return list(TEMPLATES)
 
 
 def get_prompt(ticket: str, version: str = "v1") -> str:
@@ -53,8 +135,22 @@ def get_prompt(ticket: str, version: str = "v1") -> str:
     Returns:
         Formatted prompt string ready for LLM
     """
-    template = _load_prompt_template(version)
-    if template is None:
-        available = get_available_prompts()
-        raise ValueError(f"Unknown prompt version: {version}. Available: {available}")
-    return template.format(ticket=ticket)
+    return ticket.join(_require_template_parts(version)[0])
+
+
+def get_prompt_bytes(ticket: str, version: str = "v1") -> bytes:
+    """Format prompt template with ticket text, encoded as UTF-8.
+
+    Only the ticket is encoded per call; the template text is encoded once.
+
+    Args:
+        ticket: The customer support ticket text
+        version: Which prompt template to use
+
+    Returns:
+        Formatted prompt as UTF-8 bytes
+    """
+    return ticket.encode("utf-8").join(_require_template_parts(version)[1])
+
+
+reload_prompts()
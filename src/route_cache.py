@@ -0,0 +1,47 @@
+"""Persistent cache of routing decisions for re-running evaluations."""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class RouteCache:
+    """SQLite-backed map from a routing request key to its category."""
+
+    def __init__(self, path: Path) -> None:
+        """Open (or create) the cache database at path."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS routes (key TEXT PRIMARY KEY, category TEXT NOT NULL)"
+        )
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, prompt: str) -> str:
+        """Build a cache key from the model and the fully rendered prompt.
+
+        Keying on the rendered prompt rather than the ticket means an edited
+        template never serves answers cached for its previous text.
+        """
+        return hashlib.sha256(f"{model}|{prompt_version}|{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached category for key, if any."""
+        with self._lock:
+            row = self._conn.execute("SELECT category FROM routes WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, category: str) -> None:
+        """Store the category routed for key."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO routes (key, category) VALUES (?, ?)", (key, category)
+            )
+
+    def clear(self) -> None:
+        """Remove every cached decision."""
+        with self._lock:
+            self._conn.execute("DELETE FROM routes")
@@ -1,26 +1,130 @@
 """Core routing logic with Maitai integration."""
 
+import asyncio
+import logging
 import os
-from typing import Optional
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Sequence
 
 import maitai
+from maitai.exceptions import MaitaiConnectionError
 
-from .config import MAITAI_API_KEY, ANTHROPIC_API_KEY, MODEL_NAME, APPLICATION_NAME, INTENT_NAME
-from .prompts import get_prompt, CATEGORIES
+from .config import (
+    MAITAI_API_KEY,
+    ANTHROPIC_API_KEY,
+    MODEL_NAME,
+    APPLICATION_NAME,
+    INTENT_NAME,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_RETRIES,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    ROUTE_CACHE_PATH,
+    ROUTE_MAX_TOKENS,
+)
+from .route_cache import RouteCache
+from .prompts import get_prompt, CATEGORIES, CATEGORY_SET
+
+logger = logging.getLogger(__name__)
 
 # Workaround: Set placeholder to prevent Groq client init error
 os.environ["GROQ_API_KEY"] = "placeholder-not-used"
 
+# Any category name, matched anywhere in an uppercased response in a single
+# scan. Matching the uppercased text case-sensitively is several times faster
+# than re.IGNORECASE, whose per-character case folding dominates the search.
+_CATEGORY_RE = re.compile("|".join(re.escape(category) for category in CATEGORIES))
+
+# Status code at the start of a MaitaiConnectionError message
+_ERROR_CODE_RE = re.compile(r"Error code: (\d{3})\b")
+
+# Maps a parsed category back to the CATEGORIES instance, so every result
+# shares one string object per category (match groups and splits are copies)
+_CANONICAL_CATEGORIES: dict[str, str] = {category: category for category in CATEGORIES}
+
+# Maitai intent and session_id per prompt version, formatted once per version
+_version_labels: dict[str, tuple[str, str]] = {}
+
+# Opened on first use by a route_ticket call with use_cache=True
+_route_cache: RouteCache | None = None
+_route_cache_lock = threading.Lock()
+
+
+def _get_version_labels(prompt_version: str) -> tuple[str, str]:
+    """Return the (intent, session_id) pair used for a prompt version."""
+    labels = _version_labels.get(prompt_version)
+    if labels is None:
+        # Use different intent per prompt version for Maitai observability
+        labels = (f"{INTENT_NAME}_{prompt_version}", f"routing-session-{prompt_version}")
+        _version_labels[prompt_version] = labels
+    return labels
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """Whether a failed Maitai call is worth retrying (connection error, 429 or 5xx)."""
+    if isinstance(error, (MaitaiConnectionError, TimeoutError)):
+        # Maitai also raises MaitaiConnectionError for 4xx responses other than
+        # 400/404, as "Error code: <status> - ..."; of those only 429 is transient
+        match = _ERROR_CODE_RE.match(str(error))
+        return match is None or match.group(1) == "429" or match.group(1)[0] == "5"
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def _retry_delay(attempt: int) -> float:
+    """Backoff before retry number `attempt` (0-based), with full jitter."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+
+
+def _get_route_cache() -> RouteCache:
+    """Return the process-wide routing cache, opening it on first use."""
+    global _route_cache
+    if _route_cache is None:
+        with _route_cache_lock:
+            if _route_cache is None:
+                _route_cache = RouteCache(ROUTE_CACHE_PATH)
+    return _route_cache
+
 
 class TicketRouter:
     """Routes customer support tickets to appropriate categories using Claude via Maitai."""
 
     def __init__(self) -> None:
-        """Initialize Maitai client."""
+        """Initialize the sync Maitai client.
+
+        The async client is created on first use, so sync-only callers never
+        pay for it.
+        """
         self.client = maitai.Maitai(
             maitai_api_key=MAITAI_API_KEY,
             anthropic_api_key=ANTHROPIC_API_KEY,
         )
+        self.async_client: Optional[maitai.AsyncMaitai] = None
+        self._async_client_lock = threading.Lock()
+
+    def _create_async_client(self) -> maitai.AsyncMaitai:
+        """Create the async Maitai client if no other caller has yet."""
+        with self._async_client_lock:
+            if self.async_client is None:
+                self.async_client = maitai.AsyncMaitai(
+                    maitai_api_key=MAITAI_API_KEY,
+                    anthropic_api_key=ANTHROPIC_API_KEY,
+                )
+        return self.async_client
+
+    async def _get_async_client(self) -> maitai.AsyncMaitai:
+        """Get the async Maitai client, creating it off the event loop on first use."""
+        client = self.async_client
+        if client is None:
+            # The Maitai constructor makes a blocking HTTP call to initialize the SDK
+            client = await asyncio.to_thread(self._create_async_client)
+        return client
 
     def route_ticket(
         self,
@@ -28,6 +132,8 @@ class TicketRouter:
         prompt_version: str = "v1",
         test_case_id: Optional[int] = None,
         expected_category: Optional[str] = None,
+        use_cache: bool = False,
+        rate_limit: Optional[Callable[[], None]] = None,
     ) -> str:
         """Route a support ticket to the appropriate category.
 
@@ -36,10 +142,206 @@ class TicketRouter:
             prompt_version: Which prompt template to use (v1, v2, v3)
             test_case_id: Optional ID for tracking in Maitai
             expected_category: Optional ground truth for Maitai observability
+            use_cache: Reuse a category cached on disk for the same model and
+                rendered prompt, skipping the Maitai call (and its Sentinel
+                evaluation) on a hit
+            rate_limit: Optional callable that blocks until a request may be
+                sent; not called when the answer comes from the cache
 
         Returns:
             Category string (one of 11 categories)
         """
+        request = self._build_request(ticket, prompt_version, test_case_id, expected_category)
+
+        cache_key = None
+        if use_cache:
+            cache_key = self._cache_key(request, prompt_version)
+            cached = _get_route_cache().get(cache_key)
+            if cached is not None:
+                return cached
+
+        if rate_limit is not None:
+            rate_limit()
+
+        try:
+            response = self._create_with_retry(request)
+            logger.debug("Response from Maitai (Test Case ID: %s): %s", test_case_id, response)
+
+            # OpenAI-style response format
+            category = self._parse_category(response.choices[0].message.content)
+            if cache_key is not None:
+                _get_route_cache().set(cache_key, category)
+            return category
+
+        except Exception as e:
+            logger.error("Error routing ticket: %s", e)
+            raise
+
+    async def route_ticket_async(
+        self,
+        ticket: str,
+        prompt_version: str = "v1",
+        test_case_id: Optional[int] = None,
+        expected_category: Optional[str] = None,
+        use_cache: bool = False,
+    ) -> str:
+        """Route a support ticket without blocking the event loop.
+
+        Same arguments and return value as route_ticket.
+        """
+        request = self._build_request(ticket, prompt_version, test_case_id, expected_category)
+
+        cache_key = None
+        if use_cache:
+            cache_key = self._cache_key(request, prompt_version)
+            cached = _get_route_cache().get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = await self._create_with_retry_async(request)
+            logger.debug("Response from Maitai (Test Case ID: %s): %s", test_case_id, response)
+
+            # OpenAI-style response format
+            category = self._parse_category(response.choices[0].message.content)
+            if cache_key is not None:
+                _get_route_cache().set(cache_key, category)
+            return category
+
+        except Exception as e:
+            logger.error("Error routing ticket: %s", e)
+            raise
+
+    async def route_many(
+        self,
+        tickets: Sequence[str],
+        prompt_version: str = "v1",
+        concurrency: int = MAX_CONCURRENT_REQUESTS,
+    ) -> list[str]:
+        """Route many tickets on the async client with at most `concurrency` in flight.
+
+        Args:
+            tickets: The customer support ticket texts
+            prompt_version: Which prompt template to use (v1, v2, v3)
+            concurrency: Maximum number of concurrent Maitai calls
+
+        Returns:
+            Category strings in the same order as tickets
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def route_one(ticket: str) -> str:
+            async with semaphore:
+                return await self.route_ticket_async(ticket, prompt_version)
+
+        return await asyncio.gather(*(route_one(ticket) for ticket in tickets))
+
+    async def route_many_binned(
+        self,
+        tickets: Sequence[str],
+        prompt_version: str = "v1",
+        bin_width: int = 512,
+        concurrency: int = MAX_CONCURRENT_REQUESTS,
+    ) -> list[str]:
+        """Route many tickets, dispatching them shortest length bin first.
+
+        Tickets are grouped into bins by len(ticket) // bin_width and queued bin
+        by bin behind one shared `concurrency` limit, so calls in flight at the
+        same time have similar prompt lengths and short tickets are answered
+        first. Total throughput is the same as route_many.
+
+        Args:
+            tickets: The customer support ticket texts
+            prompt_version: Which prompt template to use (v1, v2, v3)
+            bin_width: Ticket length range, in characters, covered by each bin
+            concurrency: Maximum number of concurrent Maitai calls
+
+        Returns:
+            Category strings in the same order as tickets
+        """
+        # Stable sort, so tickets keep their relative order within a bin
+        order = sorted(range(len(tickets)), key=lambda i: len(tickets[i]) // bin_width)
+        categories = await self.route_many(
+            [tickets[i] for i in order], prompt_version, concurrency
+        )
+
+        # Put each category back at its ticket's original position
+        results = [""] * len(tickets)
+        for index, category in zip(order, categories):
+            results[index] = category
+        return results
+
+    def route_tickets_batch(
+        self,
+        tickets: Sequence[str],
+        prompt_version: str = "v1",
+        test_case_ids: Optional[Sequence[Optional[int]]] = None,
+        expected_categories: Optional[Sequence[Optional[str]]] = None,
+    ) -> list[str]:
+        """Route many tickets, with up to MAX_CONCURRENT_REQUESTS calls in flight.
+
+        Args:
+            tickets: The customer support ticket texts
+            prompt_version: Which prompt template to use (v1, v2, v3)
+            test_case_ids: Optional per-ticket IDs for tracking in Maitai
+            expected_categories: Optional per-ticket ground truth for Maitai observability
+
+        Returns:
+            Category strings in the same order as tickets
+        """
+        if test_case_ids is None:
+            test_case_ids = [None] * len(tickets)
+        if expected_categories is None:
+            expected_categories = [None] * len(tickets)
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            return list(
+                executor.map(
+                    lambda ticket, test_case_id, expected_category: self.route_ticket(
+                        ticket=ticket,
+                        prompt_version=prompt_version,
+                        test_case_id=test_case_id,
+                        expected_category=expected_category,
+                    ),
+                    tickets,
+                    test_case_ids,
+                    expected_categories,
+                )
+            )
+
+    def _create_with_retry(self, request: dict[str, Any]) -> Any:
+        """Call the sync client, retrying transient errors with backoff."""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return self.client.chat.completions.create(**request)
+            except Exception as e:
+                if attempt == MAX_RETRIES or not _is_transient_error(e):
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning("Transient Maitai error (%s), retrying in %.2fs", e, delay)
+                time.sleep(delay)
+
+    async def _create_with_retry_async(self, request: dict[str, Any]) -> Any:
+        """Call the async client, retrying transient errors with backoff."""
+        client = await self._get_async_client()
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return await client.chat.completions.create(**request)
+            except Exception as e:
+                if attempt == MAX_RETRIES or not _is_transient_error(e):
+                    raise
+                delay = _retry_delay(attempt)
+                logger.warning("Transient Maitai error (%s), retrying in %.2fs", e, delay)
+                await asyncio.sleep(delay)
+
+    def _build_request(
+        self,
+        ticket: str,
+        prompt_version: str,
+        test_case_id: Optional[int],
+        expected_category: Optional[str],
+    ) -> dict[str, Any]:
+        """Build the chat completion arguments shared by the sync and async paths."""
         prompt = get_prompt(ticket, prompt_version)
 
         metadata = {
@@ -50,29 +352,25 @@ class TicketRouter:
         if expected_category is not None:
             metadata["expected_category"] = expected_category
 
-        try:
-            # Use different intent per prompt version for Maitai observability
-            intent = f"{INTENT_NAME}_{prompt_version}"
-
-            response = self.client.chat.completions.create(
-                application=APPLICATION_NAME,
-                intent=intent,
-                model=MODEL_NAME,
-                session_id=f"routing-session-{prompt_version}",
-                evaluation_enabled=True,  # Enable Sentinel evaluations
-                max_tokens=50,
-                messages=[{"role": "user", "content": prompt}],
-                metadata=metadata,
-            )
-            print(f"Response from Maitai (Test Case ID: {test_case_id}): {response}")
+        intent, session_id = _get_version_labels(prompt_version)
 
-            # OpenAI-style response format
-            category = self._parse_category(response.choices[0].message.content)
-            return category
+        return {
+            "application": APPLICATION_NAME,
+            "intent": intent,
+            "model": MODEL_NAME,
+            "session_id": session_id,
+            "evaluation_enabled": True,  # Enable Sentinel evaluations
+            "max_tokens": ROUTE_MAX_TOKENS,
+            "messages": [{"role": "user", "content": prompt}],
+            "metadata": metadata,
+        }
 
-        except Exception as e:
-            print(f"Error routing ticket: {e}")
-            raise
+    @staticmethod
+    def _cache_key(request: dict[str, Any], prompt_version: str) -> str:
+        """Build the routing cache key for a chat completion request."""
+        return RouteCache.make_key(
+            request["model"], prompt_version, request["messages"][0]["content"]
+        )
 
     def _parse_category(self, response_text: str) -> str:
         """Extract category from LLM response.
@@ -85,10 +383,39 @@ class TicketRouter:
         """
         response_upper = response_text.strip().upper()
 
-        # Look for exact category match
-        for category in CATEGORIES:
-            if category in response_upper:
-                return category
+        # The prompts ask for only the category name, which most replies follow
+        category = _CANONICAL_CATEGORIES.get(response_upper)
+        if category is not None:
+            return category
+
+        # Otherwise the category usually leads, followed by punctuation or text
+        words = response_upper.split(None, 1)
+        if words and words[0] in CATEGORY_SET:
+            return _CANONICAL_CATEGORIES[words[0]]
+
+        # Otherwise take the first category mentioned in the response
+        match = _CATEGORY_RE.search(response_upper)
+        if match:
+            return _CANONICAL_CATEGORIES[match.group(0)]
 
         # Default fallback
         return "CONTACT"
+
+
+# Process-wide router shared by callers that route repeatedly (e.g. API runs)
+_default_router: TicketRouter | None = None
+_default_router_lock = threading.Lock()
+
+
+def get_default_router() -> TicketRouter:
+    """Return the shared TicketRouter, creating it on first use.
+
+    Reusing one router keeps the Maitai clients, and their HTTP connection
+    pools, alive across runs instead of rebuilding them each time.
+    """
+    global _default_router
+    if _default_router is None:
+        with _default_router_lock:
+            if _default_router is None:
+                _default_router = TicketRouter()
+    return _default_router